@@ -1,24 +1,30 @@
-"""Generate example MCP tools for demonstration"""
+"""Generate example Python utilities for demonstration
+
+Install the package first so the import below resolves directly:
+
+    pip install -e .   # or: uv sync
+"""
 import sys
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from mcp_extend.generator import ToolGenerator
+try:
+    from mcp_extend.generator import get_generator
+except ImportError:
+    # Fall back to the source tree when the package isn't installed
+    sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    from mcp_extend.generator import get_generator
 
 
 def main():
-    generator = ToolGenerator()
+    generator = get_generator()
     output_dir = Path(__file__).parent.parent / "examples"
     
     examples = [
-        ("Calculator", "Basic math operations", "basic_function"),
         ("Weather API", "Fetch weather from wttr.in", "http_api"),
-        ("File Search", "Search and read local files", "file_operations"),
+        ("Git Helper", "Run common git commands", "shell"),
     ]
     
-    print("Generating example MCP tools...\n")
+    print("Generating example Python utilities...\n")
     
     for name, desc, template in examples:
         print(f"Creating: {name}")
@@ -29,13 +35,13 @@ def main():
             output_dir=str(output_dir)
         )
         print(f"  ✓ {result['path']}")
-        print(f"  Install: {result['install_command']}\n")
+        print(f"  Files: {', '.join(result['files_created'])}\n")
     
     print(f"Done! Examples created in: {output_dir}")
     print("\nTo test an example:")
-    print(f"  cd {output_dir}/internal-debug-api")
+    print(f"  cd {output_dir}/weather-api")
     print("  uv sync")
-    print("  uv run python server.py")
+    print("  uv run python -c 'import weather_api'")
 
 
 if __name__ == "__main__":
@@ -2,28 +2,187 @@
 Code generation logic for Python utility tools
 """
 
+from functools import cache, lru_cache
+from typing import Dict, Any, Optional, Tuple, Union
+from jinja2 import Environment, FileSystemBytecodeCache, PackageLoader
 from pathlib import Path
-from typing import Dict, Any
-from jinja2 import Environment, PackageLoader
-import re
+import os
+import stat
+
+
+# Compiled template bytecode survives across processes (CLI, MCP restarts).
+# The environment variable overrides the location; it is read each time a
+# cache is created, so tests can redirect it before first use
+JINJA_CACHE_DIR_ENV = "MCP_EXTEND_JINJA_CACHE_DIR"
+DEFAULT_JINJA_CACHE_DIR = "~/.cache/mcp_extend/jinja"
+
+
+class _SafeBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that degrades to a no-op when the disk misbehaves
+    
+    A read-only, full or over-quota cache directory must never stop
+    templates from loading; Jinja just compiles them in memory instead.
+    """
+    
+    def load_bytecode(self, bucket):
+        try:
+            super().load_bytecode(bucket)
+        except OSError:
+            bucket.reset()
+    
+    def dump_bytecode(self, bucket):
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            pass
+
+
+def make_bytecode_cache(name: str) -> Optional[FileSystemBytecodeCache]:
+    """Create an on-disk Jinja bytecode cache (None if unusable)
+    
+    Jinja keys cached code by template name only, so every Environment
+    with its own settings gets its own file pattern via ``name``.
+    """
+    directory = os.path.expanduser(
+        os.environ.get(JINJA_CACHE_DIR_ENV) or DEFAULT_JINJA_CACHE_DIR
+    )
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError:
+        return None
+    # Never load bytecode from a directory someone else can write to
+    if not stat.S_ISDIR(st.st_mode) or st.st_mode & 0o022:
+        return None
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return None
+    return _SafeBytecodeCache(
+        directory=directory,
+        pattern=f"__{name}_%s.cache"
+    )
+
+
+@cache
+def _generator_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Bytecode cache shared by all ToolGenerators, created on first use"""
+    return make_bytecode_cache("generator")
+
+
+# Resolved once; expanding "~" otherwise re-reads the environment/pwd db
+_HOME = os.path.expanduser("~")
+
+
+def _expand(path: Union[str, os.PathLike]) -> str:
+    """Expand a leading ~ against the cached home directory"""
+    path = os.fspath(path)
+    if not path.startswith("~"):
+        return path
+    if path == "~":
+        return _HOME
+    if path[1] == "/":
+        return _HOME.rstrip("/") + path[1:]
+    # ~user forms still need a pwd lookup
+    return os.path.expanduser(path)
+
+
+def _write_bytes(path: str, data: bytes):
+    """Write a generated file straight to its descriptor"""
+    # Same mode as open(path, 'wb'), minus the io object wrapping the fd
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        # os.write may be partial; loop until everything is on disk
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=1024)
+def sanitize_name(name: str, sep: str = '-') -> str:
+    """Convert tool name to valid directory name (or module name with sep='_')"""
+    # Single pass: drop special chars, collapse runs of spaces/hyphens
+    # into one separator, and never emit leading or trailing separators
+    chars = []
+    pending_sep = False
+    for ch in name.lower():
+        if ch == '-' or ch.isspace():
+            pending_sep = True
+        elif ch.isalnum() or ch == '_':
+            if pending_sep and chars:
+                chars.append(sep)
+            pending_sep = False
+            chars.append(ch)
+    return ''.join(chars)
+
+
+@lru_cache(maxsize=1024)
+def _to_script_name(name: str) -> str:
+    """Convert tool name to script/package name"""
+    return sanitize_name(name)
+
+
+@lru_cache(maxsize=1024)
+def _to_class_name(name: str) -> str:
+    """Convert tool name to PascalCase class name"""
+    # capitalize() lowercases each word as a whole, which keeps
+    # context-sensitive rules such as the Greek final sigma
+    return "".join(word.capitalize() for word in name.split())
+
+
+# Templates rendered by ToolGenerator, compiled once per instance
+_TEMPLATE_FILES = (
+    "http_api.py.jinja",
+    "shell.py.jinja",
+    "pyproject.toml.jinja",
+)
+
+# Extra runtime dependencies added to the generated pyproject.toml
+_TEMPLATE_DEPS = {
+    "http_api": ("httpx>=0.27.0",),
+}
+
+_GITIGNORE_BYTES = (
+    b"__pycache__/\n"
+    b"*.py[cod]\n"
+    b"*$py.class\n"
+    b".venv/\n"
+    b".uv/\n"
+    b"*.egg-info/\n"
+    b"dist/\n"
+    b"build/\n"
+    b".pytest_cache/"
+)
 
 
 class ToolGenerator:
     """Generates Python utility tools from templates"""
     
+    DEFAULT_OUTPUT_DIR = ".cursor/tools"
+    
     def __init__(self):
         self.env = Environment(
             loader=PackageLoader('mcp_extend', 'templates'),
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            autoescape=False,
+            auto_reload=False,
+            optimized=True,
+            bytecode_cache=_generator_bytecode_cache()
         )
+        self._templates = {
+            name: self.env.get_template(name) for name in _TEMPLATE_FILES
+        }
+        # Output depends only on the render arguments, so repeated
+        # requests for the same tool reuse the already-encoded bytes
+        self._render_files = lru_cache(maxsize=64)(self._render_files)
     
     def generate_tool(
         self,
         tool_name: str,
         description: str,
         template_type: str,
-        output_dir: str = ".cursor/tools"
+        output_dir: Optional[Union[str, os.PathLike]] = None
     ) -> Dict[str, Any]:
         """Generate a new Python utility tool
         
@@ -31,30 +190,39 @@ class ToolGenerator:
             tool_name: Name of the new tool (e.g., "github", "kibana")
             description: What the tool does
             template_type: Type of template to use (http_api, shell)
-            output_dir: Where to create the tool (default: .cursor/tools)
+            output_dir: Where to create the tool, str or path-like (default: DEFAULT_OUTPUT_DIR)
             
         Returns:
             Dictionary with status, path, files_created, and next_steps
         """
-        # Create output directory
-        output_path = Path(output_dir).expanduser() / self._sanitize_name(tool_name)
-        output_path.mkdir(parents=True, exist_ok=True)
+        sanitized = self._sanitize_name(tool_name)
+        module_name = sanitized.replace('-', '_')
+        script_name = self._to_script_name(tool_name)
+        class_name = self._to_class_name(tool_name)
         
-        # Generate files
-        self._generate_module(output_path, tool_name, description, template_type)
-        self._generate_pyproject(output_path, tool_name, description, template_type)
-        self._generate_gitignore(output_path)
+        # Create output directory
+        if output_dir is None:
+            output_dir = self.DEFAULT_OUTPUT_DIR
+        # pathlib drops "." parts and doubled slashes like the original
+        # Path-based code did (".." is kept, so symlinks resolve the same)
+        output_path = str(Path(_expand(output_dir), sanitized))
+        os.makedirs(output_path, exist_ok=True)
         
-        module_name = self._sanitize_name(tool_name).replace('-', '_')
+        # Render everything first, then write the files
+        module_bytes, pyproject_bytes = self._render_files(
+            class_name, script_name, tool_name, description, template_type
+        )
+        files = {
+            f"{module_name}.py": module_bytes,
+            "pyproject.toml": pyproject_bytes,
+            ".gitignore": _GITIGNORE_BYTES,
+        }
+        self._write_files(output_path, files)
         
         return {
             "status": "success",
-            "path": str(output_path),
-            "files_created": [
-                f"{module_name}.py",
-                "pyproject.toml",
-                ".gitignore"
-            ],
+            "path": output_path,
+            "files_created": list(files),
             "next_steps": [
                 f"cd {output_path}",
                 "uv sync  # Install dependencies",
@@ -63,63 +231,69 @@ class ToolGenerator:
             ]
         }
     
-    def _generate_module(self, path: Path, name: str, desc: str, template: str):
-        """Generate the main Python module file"""
-        template_file = self.env.get_template(f'{template}.py.jinja')
-        content = template_file.render(
+    def _get_template(self, name: str):
+        """Return a precompiled template (unknown names go through Jinja)"""
+        template = self._templates.get(name)
+        if template is None:
+            template = self.env.get_template(name)
+        return template
+    
+    def _write_files(self, path: str, files: Dict[str, bytes]):
+        """Write rendered files in order (a failure stops at that file)"""
+        for filename, content in files.items():
+            _write_bytes(os.path.join(path, filename), content)
+    
+    def _render_files(
+        self,
+        class_name: str,
+        script_name: str,
+        tool_name: str,
+        description: str,
+        template_type: str
+    ) -> Tuple[bytes, bytes]:
+        """Render the module and pyproject.toml as encoded bytes"""
+        extra_deps = _TEMPLATE_DEPS.get(template_type, ())
+        return (
+            self._render_module(class_name, tool_name, description, template_type).encode(),
+            self._render_pyproject(script_name, description, extra_deps).encode(),
+        )
+    
+    def _render_module(self, class_name: str, name: str, desc: str, template: str) -> str:
+        """Render the main Python module file"""
+        template_file = self._get_template(f'{template}.py.jinja')
+        return template_file.render(
             tool_name=name,
             description=desc,
-            class_name=self._to_class_name(name)
+            class_name=class_name
         )
-        module_name = self._sanitize_name(name).replace('-', '_')
-        (path / f"{module_name}.py").write_text(content)
     
-    def _generate_pyproject(self, path: Path, name: str, desc: str, template: str):
-        """Generate pyproject.toml"""
-        template_file = self.env.get_template('pyproject.toml.jinja')
-        
-        # Determine dependencies based on template type
-        extra_deps = []
-        if template == "http_api":
-            extra_deps.append("httpx>=0.27.0")
-        
-        content = template_file.render(
-            tool_name=self._to_script_name(name),
+    def _render_pyproject(self, script_name: str, desc: str, extra_deps: Tuple[str, ...]) -> str:
+        """Render pyproject.toml"""
+        template_file = self._get_template('pyproject.toml.jinja')
+        return template_file.render(
+            tool_name=script_name,
             description=desc,
-            script_name=self._to_script_name(name),
+            script_name=script_name,
             extra_dependencies=extra_deps
         )
-        (path / "pyproject.toml").write_text(content)
-    
-    def _generate_gitignore(self, path: Path):
-        """Generate .gitignore"""
-        gitignore = """
-__pycache__/
-*.py[cod]
-*$py.class
-.venv/
-.uv/
-*.egg-info/
-dist/
-build/
-.pytest_cache/
-"""
-        (path / ".gitignore").write_text(gitignore.strip())
     
     def _sanitize_name(self, name: str) -> str:
         """Convert tool name to valid directory name"""
-        # Replace spaces and special chars with hyphens
-        sanitized = re.sub(r'[^\w\s-]', '', name.lower())
-        sanitized = re.sub(r'[-\s]+', '-', sanitized)
-        return sanitized.strip('-')
+        return sanitize_name(name)
     
     def _to_script_name(self, name: str) -> str:
         """Convert tool name to script/package name"""
-        return self._sanitize_name(name)
+        return _to_script_name(name)
     
     def _to_class_name(self, name: str) -> str:
         """Convert tool name to PascalCase class name"""
-        return "".join(word.capitalize() for word in name.split())
+        return _to_class_name(name)
+
+
+@cache
+def get_generator() -> ToolGenerator:
+    """Return a shared ToolGenerator (builds the Jinja environment once)"""
+    return ToolGenerator()
 
 
 
@@ -9,14 +9,101 @@ Cursor forgets. Your project remembers.
 """
 
 from fastmcp import FastMCP
+from functools import cache, lru_cache
+from jinja2 import Environment, PackageLoader
 from typing import Literal, Dict, Any
 import json
 import os
 from pathlib import Path
-from .generator import ToolGenerator
+import threading
+from .generator import make_bytecode_cache, sanitize_name
 
 mcp = FastMCP("Cursor Extend ⚡")
-generator = ToolGenerator()
+
+# The server runs per project and never changes directory
+_PROJECT_NAME = Path.cwd().name
+
+
+@cache
+def _get_jinja_env() -> Environment:
+    """Shared template environment, built on first use to keep startup fast
+    
+    Compiled templates are cached in memory by name and on disk across
+    processes (each uvx launch is a short-lived process). Templates ship
+    with the package, so per-call mtime checks are skipped.
+    """
+    return Environment(
+        loader=PackageLoader("mcp_extend", "templates"),
+        autoescape=False,
+        auto_reload=False,
+        bytecode_cache=make_bytecode_cache("server")
+    )
+
+
+# Standard .gitignore for generated tools
+_GITIGNORE_CODE = """__pycache__/
+*.py[cod]
+*$py.class
+*.so
+.Python
+.venv/
+venv/
+ENV/
+.pytest_cache/
+.coverage
+htmlcov/
+dist/
+build/
+*.egg-info/
+.DS_Store
+uv.lock
+"""
+
+_BEST_PRACTICES = (
+    "Use async functions for I/O operations (HTTP requests, file reads)",
+    "Include detailed docstrings with Args, Returns, and Examples",
+    "Handle errors gracefully and return helpful error messages",
+    "Use environment variables for sensitive data (API keys, tokens)",
+    "Test locally: cd to .cursor/tools/{tool_name}, run 'uv sync', test imports"
+)
+
+
+_USAGE_TEMPLATE = """
+To use the generated tool:
+1. cd .cursor/tools/{tool_name}
+2. uv sync  # Install dependencies
+3. python -c 'from {module_name} import *; print("Ready!")'
+4. Or import in Cursor code execution:
+   from {module_name} import function_name
+   result = function_name(args)
+"""
+
+
+@lru_cache(maxsize=64)
+def _render_reference_module(tool_type: str, tool_name: str, description: str) -> str:
+    """Render the reference Python module for a tool type"""
+    return _get_jinja_env().get_template(f"{tool_type}.py.jinja").render(
+        tool_name=tool_name,
+        description=description
+    )
+
+
+@lru_cache(maxsize=64)
+def _render_reference_pyproject(tool_name: str, description: str) -> str:
+    """Render the reference pyproject.toml (independent of tool type)"""
+    return _get_jinja_env().get_template("pyproject.toml.jinja").render(
+        tool_name=tool_name,
+        description=description
+    )
+
+
+@lru_cache(maxsize=64)
+def _render_guide_instructions(tool_name: str, module_name: str) -> str:
+    """Render the step-by-step instructions for Cursor"""
+    return _get_jinja_env().get_template("tool_guide_instructions.jinja").render(
+        tool_name=tool_name,
+        module_name=module_name
+    )
 
 
 def _get_mcp_tool_guide_impl(
@@ -45,56 +132,14 @@ def _get_mcp_tool_guide_impl(
         - dependencies: What packages are needed
     """
     # Module name (sanitized for Python imports)
-    import re
-    module_name = re.sub(r'[^\w\s-]', '', tool_name.lower())
-    module_name = re.sub(r'[-\s]+', '_', module_name).strip('_')
+    module_name = sanitize_name(tool_name, '_').strip('_')
     
     # Get reference implementation from templates (in memory only)
     try:
-        # Render templates without writing to disk
-        from jinja2 import Template
-        import importlib.resources
-        
-        # Load template files
-        templates_pkg = "mcp_extend.templates"
-        
-        # Determine which template to use
-        template_file = f"{tool_type}.py.jinja"
-        
-        # Read templates as text
-        with importlib.resources.open_text(templates_pkg, template_file) as f:
-            server_template = f.read()
-        
-        with importlib.resources.open_text(templates_pkg, "pyproject.toml.jinja") as f:
-            pyproject_template = f.read()
-        
-        # Render templates with context
-        context = {
-            "tool_name": tool_name,
-            "description": user_requirements,
-        }
-        
-        server_code = Template(server_template).render(**context)
-        pyproject_code = Template(pyproject_template).render(**context)
-        
-        # Standard .gitignore
-        gitignore_code = """__pycache__/
-*.py[cod]
-*$py.class
-*.so
-.Python
-.venv/
-venv/
-ENV/
-.pytest_cache/
-.coverage
-htmlcov/
-dist/
-build/
-*.egg-info/
-.DS_Store
-uv.lock
-"""
+        # Render cached templates without writing to disk
+        server_code = _render_reference_module(tool_type, tool_name, user_requirements)
+        pyproject_code = _render_reference_pyproject(tool_name, user_requirements)
+        instructions = _render_guide_instructions(tool_name, module_name)
         
         # No MCP config needed - pure Python modules are imported directly
         
@@ -105,16 +150,8 @@ uv.lock
             "message": "Failed to prepare guide"
         }
     
-    # Load instructions template
-    with importlib.resources.open_text(templates_pkg, "tool_guide_instructions.jinja") as f:
-        instructions_template_text = f.read()
-    
-    instructions = Template(instructions_template_text).render(
-        tool_name=tool_name,
-        module_name=module_name
-    )
-    
-    # Build comprehensive guide
+    # Build comprehensive guide (fresh containers per call; only the
+    # rendered strings above are cached)
     guide = {
         "status": "success",
         "tool_name": tool_name,
@@ -127,7 +164,7 @@ uv.lock
         "reference_code": {
             f"{module_name}.py": server_code,
             "pyproject.toml": pyproject_code,
-            ".gitignore": gitignore_code,
+            ".gitignore": _GITIGNORE_CODE,
         },
         
         "directory_structure": {
@@ -139,25 +176,14 @@ uv.lock
             ]
         },
         
-        "usage_after_creation": f"""
-To use the generated tool:
-1. cd .cursor/tools/{tool_name}
-2. uv sync  # Install dependencies
-3. python -c 'from {module_name} import *; print("Ready!")'
-4. Or import in Cursor code execution:
-   from {module_name} import function_name
-   result = function_name(args)
-""",
+        "usage_after_creation": _USAGE_TEMPLATE.format_map({
+            "tool_name": tool_name,
+            "module_name": module_name
+        }),
         
         "patterns": _get_patterns_for_type(tool_type),
         
-        "best_practices": [
-            "Use async functions for I/O operations (HTTP requests, file reads)",
-            "Include detailed docstrings with Args, Returns, and Examples",
-            "Handle errors gracefully and return helpful error messages",
-            "Use environment variables for sensitive data (API keys, tokens)",
-            "Test locally: cd to .cursor/tools/{tool_name}, run 'uv sync', test imports"
-        ]
+        "best_practices": list(_BEST_PRACTICES)
     }
     
     return guide
@@ -202,55 +228,80 @@ def get_mcp_tool_guide(
     return _get_mcp_tool_guide_impl(tool_type, user_requirements, tool_name)
 
 
-def _get_patterns_for_type(tool_type: str) -> Dict[str, Any]:
-    """Get coding patterns and best practices for a specific tool type"""
-    patterns = {
-        "http_api": {
-            "async_http": {
-                "pattern": "async with httpx.AsyncClient() as client: response = await client.get(url)",
-                "explanation": "Use httpx for async HTTP requests with proper resource management"
-            },
-            "error_handling": {
-                "pattern": "try/except with httpx.HTTPStatusError and httpx.RequestError",
-                "explanation": "Catch specific HTTP errors and return helpful messages"
-            },
-            "environment_config": {
-                "pattern": "API_BASE_URL = os.getenv('API_BASE_URL', 'default')",
-                "explanation": "Use environment variables for configuration"
-            },
-            "function_signature": {
-                "pattern": "async def function_name(param: type) -> return_type:",
-                "explanation": "Use type hints for better IDE support and documentation"
-            },
-            "docstrings": {
-                "pattern": "Include docstrings with Args, Returns, and Examples sections",
-                "explanation": "Clear documentation helps Cursor understand how to use the function"
-            }
+# Coding patterns per tool type (static, built once at import)
+_PATTERNS: Dict[str, Dict[str, Any]] = {
+    "http_api": {
+        "async_http": {
+            "pattern": "async with httpx.AsyncClient() as client: response = await client.get(url)",
+            "explanation": "Use httpx for async HTTP requests with proper resource management"
         },
-        "shell": {
-            "subprocess_safety": {
-                "pattern": "subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30, check=False)",
-                "explanation": "Use subprocess.run with timeout and capture_output for safe command execution"
-            },
-            "error_handling": {
-                "pattern": "try/except with subprocess.TimeoutExpired and general Exception",
-                "explanation": "Handle timeouts and command failures gracefully"
-            },
-            "output_parsing": {
-                "pattern": "Parse stdout/stderr, check return codes, format output appropriately",
-                "explanation": "Transform raw command output into actionable information"
-            },
-            "validation": {
-                "pattern": "Validate inputs, whitelist commands (if production), check tool availability",
-                "explanation": "Security: never trust user input, restrict what can be executed"
-            },
-            "function_signature": {
-                "pattern": "def function_name(param: type) -> return_type:",
-                "explanation": "Use type hints and clear parameter names"
-            }
+        "error_handling": {
+            "pattern": "try/except with httpx.HTTPStatusError and httpx.RequestError",
+            "explanation": "Catch specific HTTP errors and return helpful messages"
         },
+        "environment_config": {
+            "pattern": "API_BASE_URL = os.getenv('API_BASE_URL', 'default')",
+            "explanation": "Use environment variables for configuration"
+        },
+        "function_signature": {
+            "pattern": "async def function_name(param: type) -> return_type:",
+            "explanation": "Use type hints for better IDE support and documentation"
+        },
+        "docstrings": {
+            "pattern": "Include docstrings with Args, Returns, and Examples sections",
+            "explanation": "Clear documentation helps Cursor understand how to use the function"
+        }
+    },
+    "shell": {
+        "subprocess_safety": {
+            "pattern": "subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30, check=False)",
+            "explanation": "Use subprocess.run with timeout and capture_output for safe command execution"
+        },
+        "error_handling": {
+            "pattern": "try/except with subprocess.TimeoutExpired and general Exception",
+            "explanation": "Handle timeouts and command failures gracefully"
+        },
+        "output_parsing": {
+            "pattern": "Parse stdout/stderr, check return codes, format output appropriately",
+            "explanation": "Transform raw command output into actionable information"
+        },
+        "validation": {
+            "pattern": "Validate inputs, whitelist commands (if production), check tool availability",
+            "explanation": "Security: never trust user input, restrict what can be executed"
+        },
+        "function_signature": {
+            "pattern": "def function_name(param: type) -> return_type:",
+            "explanation": "Use type hints and clear parameter names"
+        }
+    },
+}
+
+
+def _get_patterns_for_type(tool_type: str) -> Dict[str, Any]:
+    """Get coding patterns and best practices for a specific tool type"""
+    # Copy both levels so callers can't edit the shared pattern table
+    return {
+        name: dict(pattern)
+        for name, pattern in _PATTERNS.get(tool_type, {}).items()
     }
-    return patterns.get(tool_type, {})
+
+
+# Static parts of the remember_command response (copied into each response)
+_EXAMPLE_OTHER_COMMAND = {
+    "command": "npm test",
+    "description": "Run tests"
+}
+
+_REMEMBER_NEXT_STEPS = (
+    "💡 Commit .cursor/ and .cursorrules to git for team sharing",
+    "🎯 Add more commands or start using them"
+)
+
+
+@cache
+def _cursorrules_content() -> str:
+    """Render the .cursorrules snippet (takes no context, so render once)"""
+    return _get_jinja_env().get_template("cursorrules_commands.jinja").render().strip()
 
 
 @mcp.tool()
@@ -281,26 +332,14 @@ def remember_command(
     Example:
         remember_command("deploy", "./scripts/deploy.sh staging", "Deploy to staging")
     """
-    from jinja2 import Template
-    import importlib.resources
-    
-    # Load templates
-    templates_pkg = "mcp_extend.templates"
-    
-    with importlib.resources.open_text(templates_pkg, "remember_command_instructions.jinja") as f:
-        instructions_template = f.read()
-    
-    with importlib.resources.open_text(templates_pkg, "cursorrules_commands.jinja") as f:
-        cursorrules_template = f.read()
-    
-    # Render templates
-    instructions = Template(instructions_template).render(
+    # Render cached templates
+    instructions = _get_jinja_env().get_template("remember_command_instructions.jinja").render(
         name=name,
         command=command,
         description=description or name
     )
     
-    cursorrules_content = Template(cursorrules_template).render()
+    cursorrules_content = _cursorrules_content()
     
     # Create the command entry structure
     command_entry = {
@@ -314,7 +353,7 @@ def remember_command(
         
         "instructions_for_cursor": instructions,
         "command_entry": command_entry,
-        "cursorrules_content": cursorrules_content.strip(),
+        "cursorrules_content": cursorrules_content,
         
         "files_to_update": {
             ".cursor/commands.json": {
@@ -325,28 +364,30 @@ def remember_command(
             ".cursorrules": {
                 "action": "append_if_not_exists",
                 "check_for": "saved commands",
-                "content": cursorrules_content.strip()
+                "content": cursorrules_content
             }
         },
         
         "example_commands_json": {
             "commands": {
                 name: command_entry,
-                "example_other_command": {
-                    "command": "npm test",
-                    "description": "Run tests"
-                }
+                "example_other_command": dict(_EXAMPLE_OTHER_COMMAND)
             }
         },
         
         "next_steps": [
             f"✅ Command '{name}' will be saved to .cursor/commands.json",
-            "💡 Commit .cursor/ and .cursorrules to git for team sharing",
-            "🎯 Add more commands or start using them"
+            *_REMEMBER_NEXT_STEPS
         ]
     }
 
 
+@cache
+def _discover_instructions() -> str:
+    """Render the discovery guide (takes no context, so render once)"""
+    return _get_jinja_env().get_template("discover_commands_instructions.jinja").render()
+
+
 @mcp.tool()
 def discover_project_commands() -> dict:
     """Guide for Cursor to discover commands in this project - the command discovery magic! 🔍
@@ -362,29 +403,39 @@ def discover_project_commands() -> dict:
     Returns:
         Instructions for Cursor on how to discover and categorize commands
     """
-    from jinja2 import Template
-    import importlib.resources
-    
-    # Get current directory name for context
-    project_name = Path.cwd().name
-    
-    # Load instructions template
-    templates_pkg = "mcp_extend.templates"
-    with importlib.resources.open_text(templates_pkg, "discover_commands_instructions.jinja") as f:
-        instructions_template = f.read()
-    
-    instructions = Template(instructions_template).render()
-    
     return {
         "status": "success",
-        "message": f"🔍 Analyzing '{project_name}' for command candidates...",
+        "message": f"🔍 Analyzing '{_PROJECT_NAME}' for command candidates...",
         
-        "instructions_for_cursor": instructions
+        "instructions_for_cursor": _discover_instructions()
     }
 
 
+# Templates the server renders, compiled ahead of the first request
+_SERVER_TEMPLATES = (
+    "http_api.py.jinja",
+    "shell.py.jinja",
+    "pyproject.toml.jinja",
+    "tool_guide_instructions.jinja",
+    "remember_command_instructions.jinja",
+    "cursorrules_commands.jinja",
+    "discover_commands_instructions.jinja",
+)
+
+
+def _warm_templates():
+    """Load and compile server templates so the first tool call is fast"""
+    env = _get_jinja_env()
+    for name in _SERVER_TEMPLATES:
+        env.get_template(name)
+
+
 def main():
     """Main entry point for the MCP server"""
+    # Overlap template compilation with MCP startup (the environment itself
+    # is created here so tool calls and the warm-up thread share it)
+    _get_jinja_env()
+    threading.Thread(target=_warm_templates, daemon=True).start()
     mcp.run()
 
 
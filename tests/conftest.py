@@ -0,0 +1,74 @@
+"""
+Shared pytest configuration
+"""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+from mcp_extend.generator import JINJA_CACHE_DIR_ENV
+
+# Generated files are throwaway, so keep them in RAM when tmpfs is available
+TMPFS_ROOT = "/dev/shm"
+
+_saved_tmpdir = None
+_tmpfs_active = False
+_saved_cache_env = None
+_jinja_cache_dir = None
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--real-tmp",
+        action="store_true",
+        help="Write test output to the system temp dir instead of tmpfs",
+    )
+
+
+def _use_tmpfs(config):
+    global _saved_tmpdir, _tmpfs_active
+    # Must run before tmp_path_factory resolves its base directory
+    if config.getoption("--real-tmp") or config.option.basetemp:
+        return
+    if not sys.platform.startswith("linux") or not os.path.isdir(TMPFS_ROOT):
+        return
+    # Per-user directory: /dev/shm is shared by everyone on the machine
+    tmpfs_dir = os.path.join(TMPFS_ROOT, f"cursor-extend-tests-{os.getuid()}")
+    try:
+        os.makedirs(tmpfs_dir, mode=0o700, exist_ok=True)
+        st = os.lstat(tmpfs_dir)
+    except OSError:
+        return
+    if not stat.S_ISDIR(st.st_mode) or st.st_mode & 0o022 or st.st_uid != os.getuid():
+        return
+    _saved_tmpdir = (os.environ.get("TMPDIR"), tempfile.tempdir)
+    _tmpfs_active = True
+    os.environ["TMPDIR"] = tmpfs_dir
+    tempfile.tempdir = tmpfs_dir
+
+
+def pytest_configure(config):
+    global _saved_cache_env, _jinja_cache_dir
+    _use_tmpfs(config)
+    # Keep compiled template caches out of the developer's ~/.cache
+    _saved_cache_env = os.environ.get(JINJA_CACHE_DIR_ENV)
+    _jinja_cache_dir = tempfile.mkdtemp(prefix="cursor-extend-jinja-")
+    os.environ[JINJA_CACHE_DIR_ENV] = _jinja_cache_dir
+
+
+def _restore_env(name, value):
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+def pytest_unconfigure(config):
+    if _jinja_cache_dir is not None:
+        _restore_env(JINJA_CACHE_DIR_ENV, _saved_cache_env)
+        shutil.rmtree(_jinja_cache_dir, ignore_errors=True)
+    if _tmpfs_active:
+        _restore_env("TMPDIR", _saved_tmpdir[0])
+        tempfile.tempdir = _saved_tmpdir[1]
@@ -2,113 +2,233 @@
 Tests for the Python utility generator
 """
 
+import os
+import re
 import pytest
 from pathlib import Path
-import tempfile
-import shutil
-from mcp_extend.generator import ToolGenerator
+from jinja2 import DictLoader, Environment
+from mcp_extend.generator import (
+    JINJA_CACHE_DIR_ENV,
+    ToolGenerator,
+    _SafeBytecodeCache,
+    _expand,
+    _to_class_name,
+    make_bytecode_cache,
+    sanitize_name,
+)
 
 
-@pytest.fixture
-def temp_output_dir():
-    """Create a temporary directory for test outputs"""
-    temp_dir = tempfile.mkdtemp()
-    yield temp_dir
-    shutil.rmtree(temp_dir)
+# Symbols each generated module must contain, keyed by module file name
+EXPECTED_SYMBOLS = {
+    "test_shell.py": (
+        b"subprocess",
+        b"run_command",
+        b"check_command_available",
+    ),
+    "api_tool.py": (
+        b"httpx",
+        b"async",
+        b"query_api",  # Generic function
+        b"API_BASE_URL",  # Configuration
+        b"API_TOKEN",  # Auth support
+        b"Add your API-specific functions here",  # Guidance comment
+    ),
+}
+EXPECTED_PATTERNS = {
+    module: re.compile(b"|".join(map(re.escape, symbols)))
+    for module, symbols in EXPECTED_SYMBOLS.items()
+}
 
+# Top-level sections every get_mcp_tool_guide result must contain
+EXPECTED_GUIDE_KEYS = (
+    "instructions_for_cursor",
+    "reference_code",
+    "patterns",
+    "best_practices",
+    "directory_structure",
+)
 
-@pytest.fixture
+
+def _snapshot(path):
+    """Read every generated file in one directory scan, as raw bytes"""
+    snap = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                with open(entry.path, "rb") as f:
+                    snap[entry.name] = f.read()
+    return snap
+
+
+@pytest.fixture(scope="session")
 def generator():
+    # Templates are compiled in __init__ and the instance holds no
+    # per-call state, so one generator serves the whole session
     return ToolGenerator()
 
 
-def test_generate_shell_tool(generator, temp_output_dir):
-    """Test generating a shell command utility"""
+@pytest.fixture(scope="module", params=[
+    ("shell", "test-shell", "test_shell.py"),
+    ("http_api", "api-tool", "api_tool.py"),
+], ids=lambda param: param[0])
+def generated(generator, tmp_path_factory, request):
+    """Utility generated once per template and shared by read-only tests
+    
+    Returns (result, files, tool_dir, module) where files maps each
+    generated file name to its bytes.
+    """
+    template_type, tool_dir, module = request.param
     result = generator.generate_tool(
-        tool_name="test-shell",
-        description="Test shell command tool",
-        template_type="shell",
-        output_dir=temp_output_dir
+        tool_name=tool_dir,
+        description=f"Test {template_type} tool",
+        template_type=template_type,
+        output_dir=str(tmp_path_factory.mktemp(template_type))
     )
+    return result, _snapshot(result["path"]), tool_dir, module
+
+
+@pytest.mark.io
+def test_generate_tool(generated):
+    """Test generating a utility creates the expected files"""
+    result, files, tool_dir, module = generated
     
     assert result["status"] == "success"
-    assert "test-shell" in result["path"]
+    assert tool_dir in result["path"]
     
     # Check files were created
-    tool_path = Path(result["path"])
-    assert (tool_path / "test_shell.py").exists()
-    assert (tool_path / "pyproject.toml").exists()
-    assert (tool_path / ".gitignore").exists()
-    
-    # Check module contains expected content (pure Python, no FastMCP)
-    module_content = (tool_path / "test_shell.py").read_text()
-    assert "subprocess" in module_content
-    assert "run_command" in module_content
-    assert "check_command_available" in module_content
-    assert "FastMCP" not in module_content  # Should NOT have FastMCP
-    assert "@mcp.tool()" not in module_content  # Should NOT have decorators
-
-
-def test_generate_http_api_tool(generator, temp_output_dir):
-    """Test generating an HTTP API utility"""
-    result = generator.generate_tool(
-        tool_name="api-tool",
-        description="HTTP API wrapper",
-        template_type="http_api",
-        output_dir=temp_output_dir
-    )
-    
-    assert result["status"] == "success"
+    assert {module, "pyproject.toml", ".gitignore"} <= files.keys()
+
+
+@pytest.mark.io
+def test_generated_module_content(generated):
+    """Test generated modules are pure Python with the template's helpers"""
+    _, files, _, module = generated
+    module_content = files[module]
     
-    # Verify module contains expected content (pure Python, no FastMCP)
-    module_content = (Path(result["path"]) / "api_tool.py").read_text()
-    assert "httpx" in module_content
-    assert "async" in module_content
-    assert "query_api" in module_content  # Generic function
-    assert "API_BASE_URL" in module_content  # Configuration
-    assert "API_TOKEN" in module_content  # Auth support
-    assert "Add your API-specific functions here" in module_content  # Guidance comment
-    assert "FastMCP" not in module_content  # Should NOT have FastMCP
-    assert "@mcp.tool()" not in module_content  # Should NOT have decorators
+    # One regex pass collects every expected symbol present
+    symbols = EXPECTED_SYMBOLS[module]
+    missing = set(symbols) - set(EXPECTED_PATTERNS[module].findall(module_content))
+    assert not missing, f"{module} is missing {sorted(missing)}"
+    assert b"FastMCP" not in module_content  # Should NOT have FastMCP
+    assert b"@mcp.tool()" not in module_content  # Should NOT have decorators
 
 
-def test_generated_tool_is_valid_python(generator, temp_output_dir):
+@pytest.mark.io
+def test_generated_tool_is_valid_python(generated):
     """Test that generated Python code is syntactically valid"""
-    result = generator.generate_tool(
-        tool_name="test-tool",
-        description="Test",
-        template_type="shell",
-        output_dir=temp_output_dir
-    )
-    
-    module_file = Path(result["path"]) / "test_tool.py"
-    
-    # Try to compile the generated Python code
-    import py_compile
+    _, files, _, module = generated
+    # Compile the already-read source in memory (no .pyc written)
     try:
-        py_compile.compile(str(module_file), doraise=True)
-    except py_compile.PyCompileError as e:
+        compile(files[module], module, "exec")
+    except SyntaxError as e:
         pytest.fail(f"Generated Python code is invalid: {e}")
 
 
-def test_tool_name_sanitization(generator, temp_output_dir):
+@pytest.mark.io
+def test_tool_name_sanitization(generator, tmp_path):
     """Test that tool names with spaces/special chars are handled"""
     result = generator.generate_tool(
         tool_name="My Cool Tool!!!",
         description="Test",
         template_type="shell",
-        output_dir=temp_output_dir
+        output_dir=str(tmp_path)
     )
     
     assert result["status"] == "success"
-    # Should create a valid directory name
-    assert Path(result["path"]).exists()
+    # Should create a valid directory name (listdir fails if it is missing)
+    entries = set(os.listdir(result["path"]))
     assert "my-cool-tool" in result["path"].lower()
     # Should create valid Python module name
-    assert Path(result["path"] + "/my_cool_tool.py").exists()
+    assert "my_cool_tool.py" in entries
+
+
+@pytest.mark.io
+def test_output_dir_accepts_path_objects(generator, tmp_path):
+    """output_dir may be a Path as well as a str"""
+    result = generator.generate_tool(
+        tool_name="path-tool",
+        description="Test",
+        template_type="shell",
+        output_dir=tmp_path
+    )
+    
+    assert result["status"] == "success"
+    assert "path_tool.py" in os.listdir(tmp_path / "path-tool")
+
+
+SANITIZE_CASES = [
+    "My Cool Tool!!!",
+    "  --a--b  ",
+    "-_a",
+    "a_-",
+    "a -!- b",
+    "tab\tand\nnewline",
+    "",
+    "!!!",
+    "Café Ünïcode",
+    "naïve—dash",
+    "数据 工具",
+    "e\u0301clair",
+    "ΣΟΦΟΣ tool",
+]
 
 
-def test_get_mcp_tool_guide(temp_output_dir):
+@pytest.mark.pure
+@pytest.mark.parametrize("name", SANITIZE_CASES)
+def test_sanitize_name_matches_regex_pipeline(name):
+    """sanitize_name keeps the output of the original re.sub pair"""
+    # Directory names (ToolGenerator)
+    stripped = re.sub(r'[^\w\s-]', '', name.lower())
+    assert sanitize_name(name) == re.sub(r'[-\s]+', '-', stripped).strip('-')
+    # Module names (get_mcp_tool_guide)
+    expected = re.sub(r'[-\s]+', '_', stripped).strip('_')
+    assert sanitize_name(name, '_').strip('_') == expected
+
+
+@pytest.mark.pure
+@pytest.mark.parametrize("path", [
+    "~",
+    "~/x",
+    "~root/x",
+    "~no-such-user-here/x",
+    "relative/~x",
+    "/abs/path",
+    Path("~/x"),
+    Path("plain/path"),
+])
+def test_expand_matches_expanduser(path):
+    """_expand agrees with os.path.expanduser, including PathLike input"""
+    assert _expand(path) == os.path.expanduser(path)
+
+
+@pytest.mark.pure
+@pytest.mark.parametrize("name, expected", [
+    ("my cool tool", "MyCoolTool"),
+    ("  HTTP\tapi  ", "HttpApi"),
+    ("ΣΟΦΟΣ tool", "ΣοφοςTool"),  # final sigma
+])
+def test_to_class_name(name, expected):
+    """Class names capitalize each whitespace-separated word"""
+    assert _to_class_name(name) == expected
+
+
+@pytest.mark.io
+def test_output_path_is_normalized(generator, tmp_path, monkeypatch):
+    """Returned path drops "." parts and trailing slashes like pathlib"""
+    monkeypatch.chdir(tmp_path)
+    result = generator.generate_tool(
+        tool_name="norm",
+        description="Test",
+        template_type="shell",
+        output_dir="./out//tools/"
+    )
+    
+    assert result["path"] == "out/tools/norm"
+    assert result["next_steps"][0] == "cd out/tools/norm"
+
+
+@pytest.mark.pure
+def test_get_mcp_tool_guide():
     """Test the get_mcp_tool_guide function (instruction-based)"""
     from mcp_extend.server import _get_mcp_tool_guide_impl
     
@@ -125,19 +245,15 @@ def test_get_mcp_tool_guide(temp_output_dir):
     assert result["module_name"] == "weather"
     
     # Check instruction-based structure
-    assert "instructions_for_cursor" in result
-    assert "reference_code" in result
-    assert "patterns" in result
-    assert "best_practices" in result
-    assert "directory_structure" in result
+    missing = [key for key in EXPECTED_GUIDE_KEYS if key not in result]
+    assert not missing, missing
     
     # Verify instructions ask for confirmation
     assert "Ask user for confirmation" in result["instructions_for_cursor"]
     assert "Step 1" in result["instructions_for_cursor"]
     
     # Check reference code is included (module name, not server.py)
-    assert "weather.py" in result["reference_code"]
-    assert "pyproject.toml" in result["reference_code"]
+    assert {"weather.py", "pyproject.toml"} <= result["reference_code"].keys()
     # Should NOT have FastMCP
     assert "fastmcp" not in result["reference_code"]["weather.py"].lower()
     # Should have httpx
@@ -150,3 +266,62 @@ def test_get_mcp_tool_guide(temp_output_dir):
     # Verify tool directory structure uses .cursor/tools/
     assert ".cursor/tools" in result["directory_structure"]["path"]
     assert ".cursor/mcp-tools" not in result["directory_structure"]["path"]
+
+
+@pytest.mark.pure
+def test_get_mcp_tool_guide_returns_independent_copies():
+    """Mutating one guide must not leak into the next identical call"""
+    from mcp_extend.server import _get_mcp_tool_guide_impl
+    
+    first = _get_mcp_tool_guide_impl("shell", "Run git commands", "git-helper")
+    first["status"] = "mutated"
+    first["patterns"]["injected"] = {}
+    first["patterns"]["validation"]["pattern"] = "mutated"
+    first["reference_code"]["extra.py"] = ""
+    first["directory_structure"]["files"].append("extra.py")
+    first["best_practices"].append("mutated")
+    second = _get_mcp_tool_guide_impl("shell", "Run git commands", "git-helper")
+    
+    assert second["status"] == "success"
+    assert "injected" not in second["patterns"]
+    assert second["patterns"]["validation"]["pattern"] != "mutated"
+    assert "extra.py" not in second["reference_code"]
+    assert "extra.py" not in second["directory_structure"]["files"]
+    assert "mutated" not in second["best_practices"]
+
+
+@pytest.mark.pure
+def test_remember_command_returns_independent_copies():
+    """Mutating one remember_command response must not leak into the next"""
+    from mcp_extend.server import remember_command
+    
+    remember = getattr(remember_command, "fn", remember_command)
+    first = remember("deploy", "./deploy.sh", "Deploy")
+    example = first["example_commands_json"]["commands"]["example_other_command"]
+    example["command"] = "mutated"
+    first["next_steps"].append("mutated")
+    second = remember("deploy", "./deploy.sh", "Deploy")
+    
+    example = second["example_commands_json"]["commands"]["example_other_command"]
+    assert example["command"] == "npm test"
+    assert "mutated" not in second["next_steps"]
+
+
+@pytest.mark.io
+def test_unwritable_bytecode_cache_is_skipped(tmp_path):
+    """A broken cache directory must not stop templates from rendering"""
+    cache = _SafeBytecodeCache(directory=str(tmp_path / "missing"))
+    env = Environment(loader=DictLoader({"t": "{{ x }}"}), bytecode_cache=cache)
+    
+    assert env.get_template("t").render(x="ok") == "ok"
+
+
+@pytest.mark.io
+def test_bytecode_cache_dir_follows_environment(tmp_path, monkeypatch):
+    """The cache location is read when a cache is created"""
+    monkeypatch.setenv(JINJA_CACHE_DIR_ENV, str(tmp_path / "jinja"))
+    
+    cache = make_bytecode_cache("test")
+    
+    assert cache.directory == str(tmp_path / "jinja")
+    assert (tmp_path / "jinja").is_dir()